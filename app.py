@@ -1,29 +1,190 @@
 import streamlit as st
+import pandas as pd
 import json
+import bisect
+import functools
+import os
+import sqlite3
+from contextlib import closing
 from pathlib import Path
 from datetime import date, datetime
 import uuid
 
+import write_buffer
+
+try:
+    import orjson  # あれば速い方を使う
+except ImportError:
+    orjson = None
+
 # =============================
 # ファイル
 # =============================
 ACCOUNTS_FILE = Path("accounts.json")
-TX_FILE = Path("transactions.json")
+TX_FILE = Path("transactions.json")  # 旧形式（初回だけTX_DBへ取り込む）
+TX_DB = Path("transactions.db")
 FIXED_FILE = Path("fixed_costs.json")
 
+# 保存タイミング：EVERY＝変更のたびに書く / EVERY_N＝N回変更ごと＋終了時にまとめて書く
+FLUSH_POLICY = os.environ.get("FLUSH_POLICY", "EVERY").upper()
+FLUSH_EVERY_N = int(os.environ.get("FLUSH_EVERY_N", "20"))
+
+# 固定費の「毎月何日」の選択肢
+DAY_OPTIONS = tuple(range(1, 32))
+
+# 取引一覧の1ページの件数（ブラウザへ送るのはこの分だけ）
+TX_PAGE_SIZE = 50
+
 # =============================
 # JSON I/O
 # =============================
 def load_json(path: Path, default):
     if path.exists():
         try:
+            if orjson is not None:
+                return orjson.loads(path.read_bytes())
             return json.loads(path.read_text(encoding="utf-8"))
         except Exception:
             return default
     return default
 
-def save_json(path: Path, data):
-    path.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+@st.cache_data(show_spinner=False)
+def load_json_cached(path_str: str, mtime: float, default_json: str):
+    """mtimeをキーにキャッシュ（ファイルが変わらない限り再パースしない）"""
+    return load_json(Path(path_str), json.loads(default_json))
+
+def file_mtime(path: Path) -> float:
+    return path.stat().st_mtime if path.exists() else 0.0
+
+def load_json_mtime(path: Path, default_json: str = "[]"):
+    if FLUSH_POLICY == "EVERY_N":
+        data = write_buffer.get(path)
+        if data is not None:
+            return data
+    return load_json_cached(str(path), file_mtime(path), default_json)
+
+def write_json_atomic(path: Path, data):
+    """一時ファイルに書いてfsyncしてから置き換える（途中で落ちても元のファイルは壊れない）"""
+    tmp = path.with_suffix(".json.tmp")
+    if orjson is not None:
+        payload = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    else:
+        payload = json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
+    with open(tmp, "wb") as f:
+        f.write(payload)
+        f.flush()
+        # 中身がディスクに載る前に置き換えが反映されないように
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    # mtimeの分解能が粗いFSでも古い内容を返さないように捨てる
+    load_json_cached.clear()
+
+def save_json(path: Path, data, sync: bool = False):
+    """保存。EVERY_Nの時はバッファに積む（sync=True なら溜まっている分ごとすぐ書く）
+
+    DBにも書くハンドラは sync=True にする（取引だけ先に残って残高がずれないように）
+    """
+    if FLUSH_POLICY == "EVERY_N":
+        write_buffer.put(path, data, write_json_atomic, FLUSH_EVERY_N, sync=sync)
+    else:
+        write_json_atomic(path, data)
+    remember_data_mtimes()
+
+# =============================
+# 取引DB（SQLite）
+# =============================
+TX_COLUMNS = ("id", "date", "account", "amount", "memo")
+
+def tx_connect(path: Path = TX_DB) -> sqlite3.Connection:
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS tx("
+        "id TEXT PRIMARY KEY, date TEXT, account TEXT, amount INTEGER, memo TEXT)"
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_tx_date_account ON tx(date, account)")
+    return conn
+
+def load_transactions() -> list[dict]:
+    with closing(tx_connect()) as conn:
+        rows = conn.execute("SELECT id, date, account, amount, memo FROM tx ORDER BY date, id").fetchall()
+    return [dict(zip(TX_COLUMNS, r)) for r in rows]
+
+@st.cache_data(show_spinner=False)
+def load_transactions_cached(mtime: float):
+    """DBのmtimeをキーにキャッシュ（型そろえ・並べ替え済みの状態でキャッシュする）"""
+    transactions = load_transactions()
+    ensure_ids([], transactions, [])
+    # SQLのdate()とparse_date_safeは読める日付が違うので、並びは tx_sort_key で決める
+    # （DBからほぼ整列済みで返るのでTimsortはほぼ線形）
+    transactions.sort(key=tx_sort_key)
+    return transactions
+
+def insert_transactions(rows: list[dict]):
+    """取引を1トランザクションでまとめてINSERT（全件の書き直しはしない）"""
+    if not rows:
+        return
+    with closing(tx_connect()) as conn, conn:
+        conn.executemany(
+            "INSERT INTO tx(id, date, account, amount, memo) VALUES (?, ?, ?, ?, ?)",
+            [tuple(t[c] for c in TX_COLUMNS) for t in rows],
+        )
+    load_transactions_cached.clear()
+    remember_data_mtimes()
+
+def import_legacy_transactions(rows: list[dict]):
+    """旧transactions.jsonの取引を一時DBに入れ、成功した時だけTX_DBに置き換える
+
+    失敗しても空のTX_DBが残らないので、次の起動でまた取り込みを試す
+    """
+    # 旧データはidが重複していることがあるので振り直す
+    seen = set()
+    for t in rows:
+        if t["id"] in seen:
+            t["id"] = new_id("tx")
+        seen.add(t["id"])
+
+    tmp = TX_DB.with_suffix(".db.tmp")
+    tmp.unlink(missing_ok=True)
+    with closing(tx_connect(tmp)) as conn, conn:
+        conn.executemany(
+            "INSERT INTO tx(id, date, account, amount, memo) VALUES (?, ?, ?, ?, ?)",
+            [tuple(t[c] for c in TX_COLUMNS) for t in rows],
+        )
+    os.replace(tmp, TX_DB)
+    load_transactions_cached.clear()
+
+def delete_transaction(tx_id: str):
+    with closing(tx_connect()) as conn, conn:
+        conn.execute("DELETE FROM tx WHERE id = ?", (tx_id,))
+    load_transactions_cached.clear()
+    remember_data_mtimes()
+
+def month_range(month_prefix: str) -> tuple[str, str]:
+    """YYYY-MM → (YYYY-MM, 翌月のYYYY-MM)。date >= 前 AND date < 後 で startswith と同じ範囲"""
+    y, m = map(int, month_prefix.split("-"))
+    return month_prefix, f"{y + m // 12:04d}-{m % 12 + 1:02d}"
+
+def month_tx_keys(month_prefix: str) -> set[tuple]:
+    """YYYY-MM の取引の（日付, 口座, 金額, メモ）。重複チェック用
+
+    DBに入る値は書き込み時に型・前後の空白がそろっているので、行のタプルをそのままキーにする
+    """
+    with closing(tx_connect()) as conn:
+        return set(conn.execute(
+            "SELECT date, account, amount, memo FROM tx WHERE date >= ? AND date < ?",
+            month_range(month_prefix),
+        ))
+
+def month_totals(month_prefix: str) -> tuple[int, int]:
+    """YYYY-MM の（収入, 支出）。date のインデックスで範囲検索"""
+    with closing(tx_connect()) as conn:
+        income, expense = conn.execute(
+            "SELECT SUM(CASE WHEN amount > 0 THEN amount END),"
+            " SUM(CASE WHEN amount < 0 THEN amount END)"
+            " FROM tx WHERE date >= ? AND date < ?",
+            month_range(month_prefix),
+        ).fetchone()
+    return int(income or 0), -int(expense or 0)
 
 # =============================
 # ユーティリティ
@@ -31,82 +192,148 @@ def save_json(path: Path, data):
 def new_id(prefix: str) -> str:
     return f"{prefix}_{uuid.uuid4().hex[:12]}"
 
+@functools.lru_cache(maxsize=4096)
 def parse_date_safe(s: str):
-    """YYYY-MM-DD を date に。無理なら None"""
+    """YYYY-MM-DD を date に。無理なら None（同じ文字列は1回だけパース）"""
     try:
         return date.fromisoformat(str(s)[:10])
     except Exception:
         return None
 
-def sort_transactions_inplace(transactions: list[dict]):
-    """日付→同日なら作成順（id）で安定ソート"""
-    def key(t):
-        d = parse_date_safe(t.get("date", ""))
-        # Noneは末尾へ
-        return (d is None, d or date.max, str(t.get("id", "")))
-    transactions.sort(key=key)
+def format_tx(t: dict) -> str:
+    """取引1件の表示用テキスト"""
+    return f"{t['date']} | {t['account']} | {t['amount']:+,}円 | {t['memo']}"
+
+def tx_frame(transactions: list[dict]) -> pd.DataFrame:
+    """一覧表示用のDataFrame（表示する分だけ作る）"""
+    df = pd.DataFrame(transactions, columns=["date", "account", "amount", "memo"])
+    # 金額は一覧の表記（+534,222円）にそろえる
+    df["amount"] = [f"{amt:+,}円" for amt in df["amount"]]
+    return df.rename(columns={"date": "日付", "account": "口座", "amount": "金額", "memo": "メモ"})
+
+def tx_sort_key(t: dict):
+    """日付→同日なら作成順（id）"""
+    d = parse_date_safe(t["date"])
+    # Noneは末尾へ
+    return (d is None, d or date.max, t["id"])
+
+def insert_transaction_inplace(transactions: list[dict], t: dict):
+    """ソート済みのリストに並びを保ったまま差し込む（全体の並べ替えはしない）"""
+    bisect.insort(transactions, t, key=tx_sort_key)
+
+def remove_transaction_inplace(transactions: list[dict], t: dict):
+    """ソート済みのリストから二分探索で位置を見つけて取り除く"""
+    i = bisect.bisect_left(transactions, tx_sort_key(t), key=tx_sort_key)
+    if i < len(transactions) and transactions[i] is t:
+        del transactions[i]
+    else:
+        # 並びが崩れていた時の保険
+        transactions.remove(t)
+
+def _strip(v) -> str:
+    return str(v).strip()
+
+def _coerce(rec: dict, key: str, conv, default) -> bool:
+    """rec[key] を conv で型をそろえる（無ければ default）。変わったら True"""
+    old = rec.get(key)
+    new = conv(default if old is None else old)
+    if key in rec and type(old) is type(new) and old == new:
+        return False
+    rec[key] = new
+    return True
 
 def ensure_ids(accounts, transactions, fixed_costs):
-    """古いデータにidが無ければ補完して保存"""
+    """古いデータにidが無ければ補完し、型もそろえる（以降のループは素のアクセスでOK）"""
     changed = False
 
     for a in accounts:
         if "id" not in a:
             a["id"] = new_id("acc")
             changed = True
-        if "balance" not in a:
-            a["balance"] = 0
-            changed = True
-        if "name" not in a:
-            a["name"] = "未設定口座"
-            changed = True
+        changed |= _coerce(a, "name", _strip, "未設定口座")
+        changed |= _coerce(a, "balance", int, 0)
 
+    # 取引はDBが正なので型をそろえるだけ（保存は不要）
+    today = str(date.today())
     for t in transactions:
         if "id" not in t:
             t["id"] = new_id("tx")
-            changed = True
-        # date/account/amount/memoの最低限補完
-        if "date" not in t:
-            t["date"] = str(date.today())
-            changed = True
-        if "account" not in t:
-            t["account"] = ""
-            changed = True
-        if "amount" not in t:
-            t["amount"] = 0
-            changed = True
-        if "memo" not in t:
-            t["memo"] = ""
-            changed = True
+        _coerce(t, "date", str, today)
+        _coerce(t, "account", _strip, "")
+        _coerce(t, "amount", int, 0)
+        _coerce(t, "memo", _strip, "")
 
     for fc in fixed_costs:
         if "id" not in fc:
             fc["id"] = new_id("fc")
             changed = True
-        if "day" not in fc:
-            fc["day"] = 1
-            changed = True
-        if "memo" not in fc:
-            fc["memo"] = ""
-            changed = True
+        changed |= _coerce(fc, "name", _strip, "")
+        changed |= _coerce(fc, "account", _strip, "")
+        changed |= _coerce(fc, "amount", int, 0)
+        changed |= _coerce(fc, "memo", _strip, "")
+        changed |= _coerce(fc, "day", int, 1)
 
     return changed
 
 # =============================
 # 読み込み
 # =============================
-accounts = load_json(ACCOUNTS_FILE, [])
-transactions = load_json(TX_FILE, [])
-fixed_costs = load_json(FIXED_FILE, [])
-
-# id補完
-if ensure_ids(accounts, transactions, fixed_costs):
-    save_json(ACCOUNTS_FILE, accounts)
-    save_json(TX_FILE, transactions)
-    save_json(FIXED_FILE, fixed_costs)
-
-# 取引は常にソート
-sort_transactions_inplace(transactions)
+def data_mtimes() -> tuple[float, float, float, int]:
+    """読み直しの判定用。EVERY_Nの保存待ちはmtimeに出ないのでバッファの世代も入れる"""
+    return (
+        file_mtime(ACCOUNTS_FILE),
+        file_mtime(TX_DB),
+        file_mtime(FIXED_FILE),
+        write_buffer.generation,
+    )
+
+def remember_data_mtimes():
+    """自分で保存した後のmtimeを覚えておく（次のrerunで読み直さないように）"""
+    st.session_state.data_mtimes = data_mtimes()
+
+def load_all():
+    """口座・取引・固定費を読み込む（id補完・型そろえ込み）"""
+    # 旧transactions.jsonがあれば初回だけDBへ取り込む
+    if not TX_DB.exists() and TX_FILE.exists():
+        legacy_txs = load_json(TX_FILE, [])
+        ensure_ids([], legacy_txs, [])
+        import_legacy_transactions(legacy_txs)
+
+    accounts = load_json_mtime(ACCOUNTS_FILE)
+    transactions = load_transactions_cached(file_mtime(TX_DB))
+    fixed_costs = load_json_mtime(FIXED_FILE)
+
+    # id補完（取引は load_transactions_cached 側で済んでいるので口座・固定費だけ）
+    if ensure_ids(accounts, [], fixed_costs):
+        save_json(ACCOUNTS_FILE, accounts)
+        save_json(FIXED_FILE, fixed_costs)
+
+    # 取引は load_transactions_cached で tx_sort_key 順になっている
+    return accounts, transactions, fixed_costs
+
+# セッションに持っておき、ファイル/DBが外で変わった時だけ読み直す
+# （ハンドラはセッションのリストを直接更新してから保存する）
+if st.session_state.get("data_mtimes") != data_mtimes():
+    (
+        st.session_state.accounts,
+        st.session_state.transactions,
+        st.session_state.fixed_costs,
+    ) = load_all()
+    remember_data_mtimes()
+
+accounts = st.session_state.accounts
+transactions = st.session_state.transactions
+fixed_costs = st.session_state.fixed_costs
+
+# 口座名→参照・選択肢（口座の追加・削除は直後にrerunするので毎回作り直しでOK）
+# 同じ名前の口座があっても、元の実装どおり先頭のものを使う
+acc_by_name = {}
+for a in accounts:
+    acc_by_name.setdefault(a["name"], a)
+account_names = [a["name"] for a in accounts]
+
+# 今月（一括追加とメトリクスで共用）
+month_prefix = date.today().strftime("%Y-%m")
 
 # =============================
 # UI
@@ -127,10 +354,10 @@ with st.sidebar:
         else:
             with st.form("add_fixed"):
                 fc_name = st.text_input("固定費名（例：奨学金 / Paidy / NURO光）")
-                fc_account = st.selectbox("引き落とし口座", [a["name"] for a in accounts])
+                fc_account = st.selectbox("引き落とし口座", account_names)
                 fc_amount = st.number_input("金額（出金はマイナス）", value=-1000, step=100)
                 fc_memo = st.text_input("メモ（任意）", value="固定費")
-                fc_day = st.selectbox("毎月何日に追加する？", options=list(range(1, 32)), index=24)
+                fc_day = st.selectbox("毎月何日に追加する？", options=DAY_OPTIONS, index=24)
 
                 if st.form_submit_button("テンプレを追加"):
                     if fc_name.strip() == "":
@@ -156,9 +383,9 @@ with st.sidebar:
         st.info("固定費テンプレがまだないよ")
     else:
         for fc in fixed_costs:
-            day = int(fc.get("day", 1))
-            memo = str(fc.get("memo", "")).strip()
-            text = f"・{fc.get('name','')} / {fc.get('account','')} / {int(fc.get('amount',0)):,}円 / 毎月{day}日"
+            day = fc["day"]
+            memo = fc["memo"]
+            text = f"・{fc['name']} / {fc['account']} / {fc['amount']:,}円 / 毎月{day}日"
             if memo:
                 text += f" / {memo}"
 
@@ -167,7 +394,7 @@ with st.sidebar:
                 st.write(text)
             with col2:
                 if st.button("削除", key=f"del_fc_{fc.get('id')}"):
-                    fixed_costs = [x for x in fixed_costs if x.get("id") != fc.get("id")]
+                    fixed_costs.remove(fc)
                     save_json(FIXED_FILE, fixed_costs)
                     st.success("テンプレを削除した！")
                     st.rerun()
@@ -179,7 +406,6 @@ with st.sidebar:
         st.info("固定費テンプレがまだないよ（上で追加してね）")
     else:
         if st.button("📌 今月の固定費を一括追加（重複はスキップ）"):
-            month_prefix = date.today().strftime("%Y-%m")
             today_day = date.today().day
 
             added = 0
@@ -187,11 +413,12 @@ with st.sidebar:
             skipped_dup = 0
             skipped_no_account = 0
 
-            # 口座名→参照
-            acc_map = {a["name"]: a for a in accounts}
+            # 今月の既存取引のキー（同じ日付・口座・金額・メモ）
+            existing = month_tx_keys(month_prefix)
+            new_txs = []
 
             for fc in fixed_costs:
-                day = int(fc.get("day", 1))
+                day = fc["day"]
 
                 # まだ当日じゃない固定費はスキップ（ルール）
                 if today_day < day:
@@ -199,52 +426,46 @@ with st.sidebar:
                     continue
 
                 tx_date = f"{month_prefix}-{day:02d}"
-                tx_account = str(fc.get("account", "")).strip()
-                amount = int(fc.get("amount", 0))
-                name = str(fc.get("name", "")).strip()
-                memo2 = str(fc.get("memo", "")).strip()
+                tx_account = fc["account"]
+                amount = fc["amount"]
+                name = fc["name"]
+                memo2 = fc["memo"]
 
                 tx_memo = f"固定費:{name}"
                 if memo2:
                     tx_memo += f" / {memo2}"
 
                 # 重複チェック（同じ日付・口座・金額・メモ）
-                dup = False
-                for t in transactions:
-                    if (
-                        str(t.get("date", "")) == tx_date
-                        and str(t.get("account", "")).strip() == tx_account
-                        and int(t.get("amount", 0)) == amount
-                        and str(t.get("memo", "")).strip() == tx_memo
-                    ):
-                        dup = True
-                        break
-                if dup:
+                key = (tx_date, tx_account, amount, tx_memo)
+                if key in existing:
                     skipped_dup += 1
                     continue
 
                 # 口座存在チェック
-                if tx_account not in acc_map:
+                if tx_account not in acc_by_name:
                     skipped_no_account += 1
                     continue
 
                 # 取引追加
-                transactions.append({
+                new_txs.append({
                     "id": new_id("tx"),
                     "date": tx_date,
                     "account": tx_account,
                     "amount": amount,
                     "memo": tx_memo,
                 })
-
-                # 残高反映
-                acc_map[tx_account]["balance"] = int(acc_map[tx_account].get("balance", 0)) + amount
+                existing.add(key)
                 added += 1
 
-            # 並び替えて保存
-            sort_transactions_inplace(transactions)
-            save_json(TX_FILE, transactions)
-            save_json(ACCOUNTS_FILE, accounts)
+            # 先にDBへ書く（失敗したらセッションの一覧・残高は変えない）
+            insert_transactions(new_txs)
+
+            # 並びを保って差し込み、残高反映して保存
+            for t in new_txs:
+                insert_transaction_inplace(transactions, t)
+                acc_by_name[t["account"]]["balance"] += t["amount"]
+            if new_txs:
+                save_json(ACCOUNTS_FILE, accounts, sync=True)
 
             st.success(
                 f"追加:{added}件 / 未到来:{skipped_future}件 / 重複:{skipped_dup}件 / 口座なし:{skipped_no_account}件"
@@ -254,13 +475,8 @@ with st.sidebar:
 # =============================
 # メトリクス（上）
 # =============================
-total_balance = sum(int(a.get("balance", 0)) for a in accounts)
-
-month_prefix = date.today().strftime("%Y-%m")
-month_income = sum(int(t.get("amount", 0)) for t in transactions
-                   if str(t.get("date","")).startswith(month_prefix) and int(t.get("amount",0)) > 0)
-month_expense = -sum(int(t.get("amount", 0)) for t in transactions
-                     if str(t.get("date","")).startswith(month_prefix) and int(t.get("amount",0)) < 0)
+total_balance = sum(a["balance"] for a in accounts)
+month_income, month_expense = month_totals(month_prefix)
 
 c1, c2, c3 = st.columns(3)
 c1.metric("💰 合計残高", f"{total_balance:,}円")
@@ -279,11 +495,11 @@ else:
     for acc in accounts:
         col1, col2 = st.columns([8, 2])
         with col1:
-            st.write(f"・{acc.get('name','')}（残高：{int(acc.get('balance',0)):,}円）")
+            st.write(f"・{acc['name']}（残高：{acc['balance']:,}円）")
         with col2:
             if st.button("口座削除", key=f"del_acc_{acc.get('id')}"):
                 # 口座削除（※その口座の取引は残す。必要なら後で連動削除もできる）
-                accounts = [a for a in accounts if a.get("id") != acc.get("id")]
+                accounts.remove(acc)
                 save_json(ACCOUNTS_FILE, accounts)
                 st.success("口座を削除した！")
                 st.rerun()
@@ -317,30 +533,25 @@ if len(accounts) == 0:
 else:
     with st.form("add_tx"):
         d = st.date_input("日付", value=date.today())
-        acc_name = st.selectbox("口座", [a["name"] for a in accounts], key="tx_account")
+        acc_name = st.selectbox("口座", account_names, key="tx_account")
         amount = st.number_input("金額（出金はマイナス、入金はプラス）", value=0, step=1000)
         memo = st.text_input("メモ（任意）", key="tx_memo")
 
         if st.form_submit_button("取引を追加"):
-            # 残高反映
-            for a in accounts:
-                if a["name"] == acc_name:
-                    a["balance"] = int(a.get("balance", 0)) + int(amount)
-                    break
-
-            # 取引追加
-            transactions.append({
+            # 取引追加（DBへは1行INSERTだけ。失敗したらセッションは変えない）
+            new_t = {
                 "id": new_id("tx"),
                 "date": str(d),
                 "account": acc_name,
                 "amount": int(amount),
                 "memo": memo.strip()
-            })
+            }
+            insert_transactions([new_t])
 
-            # 並び替えて保存
-            sort_transactions_inplace(transactions)
-            save_json(ACCOUNTS_FILE, accounts)
-            save_json(TX_FILE, transactions)
+            # 並びを保って差し込み、残高反映して保存
+            insert_transaction_inplace(transactions, new_t)
+            acc_by_name[acc_name]["balance"] += new_t["amount"]
+            save_json(ACCOUNTS_FILE, accounts, sync=True)
 
             st.success("取引を追加した！（時系列に並べ替え済み）")
             st.rerun()
@@ -354,38 +565,39 @@ st.subheader("📊 取引一覧（時系列：古い → 新しい）")
 if len(transactions) == 0:
     st.info("まだ取引がありません")
 else:
-    # ここは表示用にコピー（安全）
-    display_txs = list(transactions)
-    sort_transactions_inplace(display_txs)
-
-    for t in display_txs:
-        col1, col2 = st.columns([8, 2])
-        amt = int(t.get("amount", 0))
-        sign = "+" if amt > 0 else ""
-        with col1:
-            st.write(f"{t.get('date','')} | {t.get('account','')} | {sign}{amt:,}円 | {t.get('memo','')}")
-        with col2:
-            if st.button("削除", key=f"del_tx_{t.get('id')}"):
-                # 実データから該当IDを削除
-                tx_id = t.get("id")
-                target = None
-                for x in transactions:
-                    if x.get("id") == tx_id:
-                        target = x
-                        break
-
-                if target is not None:
-                    # 残高を巻き戻す
-                    for a in accounts:
-                        if a.get("name") == target.get("account"):
-                            a["balance"] = int(a.get("balance", 0)) - int(target.get("amount", 0))
-                            break
-
-                    transactions = [x for x in transactions if x.get("id") != tx_id]
-
-                    sort_transactions_inplace(transactions)
-                    save_json(ACCOUNTS_FILE, accounts)
-                    save_json(TX_FILE, transactions)
-
-                    st.success("取引を削除して残高を戻した！")
-                    st.rerun()
\ No newline at end of file
+    # transactions は追加・削除のたびに並びを保っているので、そのまま使う
+    # ページ分けして最新のページだけ出す（1ページ目＝最新）
+    n_pages = (len(transactions) - 1) // TX_PAGE_SIZE + 1
+    page = st.number_input(f"ページ（1＝最新 / 全{n_pages}ページ）", min_value=1, max_value=n_pages, value=1, step=1)
+    end = len(transactions) - (int(page) - 1) * TX_PAGE_SIZE
+    page_txs = transactions[max(0, end - TX_PAGE_SIZE):end]
+
+    # 一覧は表1つ（行ごとのウィジェットは作らない）
+    st.dataframe(tx_frame(page_txs), hide_index=True, width="stretch")
+
+    # 削除は選択1つ＋ボタン1つ（このページの分を新しい順に並べる）
+    col1, col2 = st.columns([8, 2])
+    with col1:
+        # index=None：選んでいた取引が消えたら None になる（別の行を消さないように）
+        target = st.selectbox(
+            "削除する取引",
+            options=page_txs[::-1],
+            format_func=format_tx,
+            index=None,
+            placeholder="削除する取引を選んでね",
+            key="del_tx_target",
+        )
+    with col2:
+        if st.button("削除", key="del_tx") and target is not None:
+            # 先にDBから消す（失敗したらセッションの一覧・残高は変えない）
+            delete_transaction(target["id"])
+            remove_transaction_inplace(transactions, target)
+
+            # 残高を巻き戻す
+            a = acc_by_name.get(target["account"])
+            if a is not None:
+                a["balance"] -= target["amount"]
+                save_json(ACCOUNTS_FILE, accounts, sync=True)
+
+            st.success("取引を削除して残高を戻した！")
+            st.rerun()
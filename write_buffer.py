@@ -0,0 +1,50 @@
+"""FLUSH_POLICY=EVERY_N 用の保存待ちバッファ
+
+app.py は rerun のたびに実行し直されるし、st.cache_resource は「Clear cache」で消えるので、
+プロセスで1つだけ残るように普通のモジュールに置く（import は1回しか実行されない）。
+"""
+import atexit
+import copy
+import threading
+
+lock = threading.RLock()
+pending: dict = {}  # Path -> 保存待ちのデータ
+count = 0  # 前回書き出してからの保存回数
+generation = 0  # 保存のたびに増える（他のセッションが読み直すかどうかの判定用）
+_writer = None  # 最後に渡された書き込み関数（終了時の書き出しに使う）
+
+
+def get(path):
+    """保存待ちのデータがあればそのコピー、無ければ None"""
+    with lock:
+        if path in pending:
+            return copy.deepcopy(pending[path])
+    return None
+
+
+def put(path, data, writer, every_n: int, sync: bool = False):
+    """保存待ちに積む。every_n 回たまるか sync の時は全部書き出す"""
+    global count, generation, _writer
+    with lock:
+        pending[path] = copy.deepcopy(data)
+        count += 1
+        generation += 1
+        _writer = writer
+        if sync or count >= every_n:
+            flush(writer)
+
+
+def flush(writer=None):
+    """保存待ちを全部 writer(path, data) で書き出す"""
+    global count
+    with lock:
+        writer = writer or _writer
+        if writer is None:
+            return
+        for path, data in pending.items():
+            writer(path, data)
+        pending.clear()
+        count = 0
+
+
+atexit.register(flush)